@@ -58,15 +58,15 @@ def _discover_temp_files(temp_dir: Path) -> tuple[list[Path], list[Path]]:
 def _parse_slide_list(slide_list_str: str) -> list[int]:
     """Parse a comma-separated list of slide numbers (1-based) into sorted ints."""
     try:
-        indices = [int(s.strip()) for s in slide_list_str.split(",")]
+        indices = {int(s.strip()) for s in slide_list_str.split(",")}
     except ValueError:
         print(f"Error: invalid slide list '{slide_list_str}'. Use comma-separated numbers, e.g. 2,3,7",
               file=sys.stderr)
         sys.exit(1)
-    if any(i < 1 for i in indices):
+    if min(indices) < 1:
         print("Error: slide numbers must be >= 1.", file=sys.stderr)
         sys.exit(1)
-    return sorted(set(indices))
+    return sorted(indices)
 
 
 def _resolve_videos_and_fps(
@@ -114,7 +114,7 @@ def _parse_slides(input_path: Path, fmt: str) -> list:
         return parse_marp(str(input_path))
 
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
     parser = argparse.ArgumentParser(
         prog="deck2video",
         description="Convert a Marp or Slidev markdown presentation into a narrated MP4 video.",
@@ -157,7 +157,7 @@ def main() -> None:
                              help="Regenerate TTS audio for the listed slides (e.g. 2,3,7), "
                                   "then reassemble. Requires --temp-dir and the input .md file.")
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Validate --reassemble / --redo-slides requirements
     if args.reassemble or args.redo_slides:
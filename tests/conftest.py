@@ -2,10 +2,21 @@
 
 from __future__ import annotations
 
+import os
 import textwrap
+from pathlib import Path
+from unittest.mock import Mock
 
 import pytest
 
+from deck2video.__main__ import main
+from deck2video.models import Slide
+
+
+def _touch_fast(path):
+    """Create an empty file without the utime() call Path.touch() makes."""
+    os.close(os.open(path, os.O_CREAT | os.O_WRONLY, 0o644))
+
 
 # ---------------------------------------------------------------------------
 # Minimal Marp decks (strings) used across multiple test modules
@@ -75,6 +86,53 @@ def tmp_deck_with_video(tmp_path):
     return p
 
 
+@pytest.fixture(scope="module")
+def marp_md(tmp_path_factory):
+    """Write a one-slide Marp deck once per module and return its path.
+
+    Only for tests that mock the parser and never modify the file.
+    """
+    p = tmp_path_factory.mktemp("deck") / "deck.md"
+    p.write_text("---\nmarp: true\n---\n\n# Slide\n")
+    return p
+
+
+@pytest.fixture
+def touch_file():
+    """Return a callable that creates an empty file at the given path."""
+    return _touch_fast
+
+
+@pytest.fixture
+def make_temp_files(tmp_path):
+    """Return a callable that fills tmp_path with empty slide images and WAVs.
+
+    Files follow the pipeline's naming (``slides.001.png``, ``audio_001.wav``);
+    pass ``png_suffix=""`` for Marp-style extensionless images.
+    """
+    def _mk(n_png, n_wav, png_suffix=".png"):
+        for i in range(1, n_png + 1):
+            _touch_fast(tmp_path / f"slides.{i:03d}{png_suffix}")
+        for i in range(1, n_wav + 1):
+            _touch_fast(tmp_path / f"audio_{i:03d}.wav")
+        return tmp_path
+    return _mk
+
+
+@pytest.fixture(scope="session")
+def populated_build_dir(tmp_path_factory):
+    """Create a temp dir holding two slide images and two WAVs, once per session.
+
+    Suitable for --reassemble / --redo-slides runs with a mocked pipeline:
+    main() only adds its log file there. Copy it before making other changes.
+    """
+    d = tmp_path_factory.mktemp("build")
+    for i in (1, 2):
+        _touch_fast(d / f"slides.{i:03d}.png")
+        _touch_fast(d / f"audio_{i:03d}.wav")
+    return d
+
+
 @pytest.fixture
 def silent_wav(tmp_path):
     """Generate a short silent WAV and return its path."""
@@ -83,3 +141,89 @@ def silent_wav(tmp_path):
     p = tmp_path / "silence.wav"
     generate_silent_wav(p, duration=1.0)
     return p
+
+
+# ---------------------------------------------------------------------------
+# Pipeline mocks for deck2video.__main__
+# ---------------------------------------------------------------------------
+
+def _pipeline_defaults():
+    """Return fresh default return values for each pipeline step, keyed by target.
+
+    Built per call so a test that mutates a returned list cannot leak into
+    later tests. ``None`` means "leave the mock's own return value".
+    """
+    return {
+        "deck2video.__main__.check_ffmpeg": None,
+        "deck2video.__main__.detect_format": "marp",
+        "deck2video.__main__.parse_marp": [
+            Slide(index=1, body="body", notes="Hello.", video=None),
+            Slide(index=2, body="body", notes=None, video=None),
+        ],
+        "deck2video.__main__.parse_slidev": [
+            Slide(index=1, body="body", notes="Hello.", video=None),
+            Slide(index=2, body="body", notes=None, video=None),
+        ],
+        "deck2video.__main__.render_slides": [
+            Path("/tmp/slides.001"), Path("/tmp/slides.002"),
+        ],
+        "deck2video.__main__.render_slidev_slides": [
+            Path("/tmp/slides.001.png"), Path("/tmp/slides.002.png"),
+        ],
+        "deck2video.__main__.generate_audio_for_slides": [
+            Path("/tmp/audio_001.wav"), Path("/tmp/audio_002.wav"),
+        ],
+        "deck2video.__main__.assemble_video": None,
+        "deck2video.__main__.get_video_fps": 30.0,
+    }
+
+
+# Built once per session; _patch_pipeline() resets them rather than
+# constructing fresh mocks for every test.  (copy.copy() is not an option:
+# a shallow copy shares the original's call list.)
+_PIPELINE_TEMPLATE = {target: Mock() for target in _pipeline_defaults()}
+
+
+def _patch_pipeline():
+    """Reset the shared module-level pipeline mocks and return them.
+
+    Clears recorded calls, return values and side effects on every mock in
+    _PIPELINE_TEMPLATE, then applies fresh defaults. The same mock objects
+    are returned on every call, keyed by patch target.
+    """
+    for target, default in _pipeline_defaults().items():
+        mock = _PIPELINE_TEMPLATE[target]
+        mock.reset_mock(return_value=True, side_effect=True)
+        if default is not None:
+            mock.return_value = default
+    return dict(_PIPELINE_TEMPLATE)
+
+
+@pytest.fixture
+def pipeline_mocks(monkeypatch):
+    """Install mocks for every pipeline step into deck2video.__main__.
+
+    Returns the mocks keyed by patch target so tests can adjust return values
+    or inspect calls.
+    """
+    mocks = _patch_pipeline()
+    for target, mock in mocks.items():
+        monkeypatch.setattr(target, mock)
+    return mocks
+
+
+@pytest.fixture
+def run_main(monkeypatch, pipeline_mocks):
+    """Return a callable that runs the CLI against the pipeline mocks.
+
+    ``argv`` excludes the program name. ``patches`` maps extra patch targets
+    to mocks installed for the run. The callable returns every active mock
+    keyed by target.
+    """
+    def _run(argv, patches=None):
+        patches = patches or {}
+        for target, mock in patches.items():
+            monkeypatch.setattr(target, mock)
+        main(argv)
+        return {**pipeline_mocks, **patches}
+    return _run
@@ -5,47 +5,14 @@ from __future__ import annotations
 import json
 import shutil
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import DEFAULT, Mock
 
 import pytest
 
-from deck2video.__main__ import _discover_temp_files, _parse_slide_list, _resolve_videos_and_fps
+from deck2video.__main__ import _discover_temp_files, _parse_slide_list, _resolve_videos_and_fps, main
 from deck2video.models import Slide
 
 
-# ---------------------------------------------------------------------------
-# Helpers
-# ---------------------------------------------------------------------------
-
-def _patch_pipeline(**overrides):
-    """Return a dict of patches for all pipeline steps with sensible defaults."""
-    defaults = {
-        "deck2video.__main__.check_ffmpeg": MagicMock(),
-        "deck2video.__main__.detect_format": MagicMock(return_value="marp"),
-        "deck2video.__main__.parse_marp": MagicMock(return_value=[
-            Slide(index=1, body="body", notes="Hello.", video=None),
-            Slide(index=2, body="body", notes=None, video=None),
-        ]),
-        "deck2video.__main__.parse_slidev": MagicMock(return_value=[
-            Slide(index=1, body="body", notes="Hello.", video=None),
-            Slide(index=2, body="body", notes=None, video=None),
-        ]),
-        "deck2video.__main__.render_slides": MagicMock(return_value=[
-            Path("/tmp/slides.001"), Path("/tmp/slides.002"),
-        ]),
-        "deck2video.__main__.render_slidev_slides": MagicMock(return_value=[
-            Path("/tmp/slides.001.png"), Path("/tmp/slides.002.png"),
-        ]),
-        "deck2video.__main__.generate_audio_for_slides": MagicMock(return_value=[
-            Path("/tmp/audio_001.wav"), Path("/tmp/audio_002.wav"),
-        ]),
-        "deck2video.__main__.assemble_video": MagicMock(),
-        "deck2video.__main__.get_video_fps": MagicMock(return_value=30.0),
-    }
-    defaults.update(overrides)
-    return defaults
-
-
 # ---------------------------------------------------------------------------
 # Argument parsing
 # ---------------------------------------------------------------------------
@@ -53,41 +20,23 @@ def _patch_pipeline(**overrides):
 class TestArgParsing:
     def test_input_required(self):
         with pytest.raises(SystemExit):
-            from deck2video.__main__ import main
-            with patch("sys.argv", ["deck2video"]):
-                main()
+            main([])
 
     def test_missing_input_file_exits(self, tmp_path):
-        from deck2video.__main__ import main
-        with patch("sys.argv", ["deck2video", str(tmp_path / "nonexistent.md")]):
-            with pytest.raises(SystemExit):
-                main()
+        with pytest.raises(SystemExit):
+            main([str(tmp_path / "nonexistent.md")])
 
-    def test_default_output_derives_from_input(self, tmp_path):
+    def test_default_output_derives_from_input(self, tmp_path, run_main):
         md = tmp_path / "talk.md"
         md.write_text("---\nmarp: true\n---\n\n# Slide\n")
 
-        patches = _patch_pipeline()
-        with patch("sys.argv", ["deck2video", str(md)]):
-            for target, mock in patches.items():
-                with patch(target, mock):
-                    pass
-
-            # We need all patches active at once
-            import contextlib
-            with contextlib.ExitStack() as stack:
-                mocks = {}
-                for target, mock_obj in patches.items():
-                    mocks[target] = stack.enter_context(patch(target, mock_obj))
+        mocks = run_main([str(md)])
 
-                from deck2video.__main__ import main
-                main()
-
-                # assemble_video should be called with output = talk.mp4
-                assemble_call = mocks["deck2video.__main__.assemble_video"]
-                call_args = assemble_call.call_args
-                output_arg = call_args[0][2]  # third positional arg
-                assert output_arg == md.with_suffix(".mp4")
+        # assemble_video should be called with output = talk.mp4
+        assemble_call = mocks["deck2video.__main__.assemble_video"]
+        call_args = assemble_call.call_args
+        output_arg = call_args[0][2]  # third positional arg
+        assert output_arg == md.with_suffix(".mp4")
 
 
 # ---------------------------------------------------------------------------
@@ -95,37 +44,17 @@ class TestArgParsing:
 # ---------------------------------------------------------------------------
 
 class TestPipelineOrchestration:
-    def _run_main(self, argv, patches):
-        import contextlib
-        from deck2video.__main__ import main
-
-        with patch("sys.argv", argv):
-            with contextlib.ExitStack() as stack:
-                mocks = {}
-                for target, mock_obj in patches.items():
-                    mocks[target] = stack.enter_context(patch(target, mock_obj))
-                main()
-                return mocks
-
-    def test_all_stages_called_in_order(self, tmp_path):
-        md = tmp_path / "deck.md"
-        md.write_text("---\nmarp: true\n---\n\n# Slide\n")
+    def test_all_stages_called_in_order(self, pipeline_mocks, marp_md, run_main):
         call_order = []
 
-        patches = _patch_pipeline()
-        for key in patches:
-            original = patches[key]
-
-            def make_side_effect(name, orig):
-                def side_effect(*a, **kw):
-                    call_order.append(name.split(".")[-1])
-                    return orig.return_value
-                return side_effect
-
-            patches[key] = MagicMock(side_effect=make_side_effect(key, original))
-            patches[key].return_value = original.return_value
+        # Record each call on the installed mocks; returning DEFAULT keeps
+        # their configured return_value.
+        for key, mock in pipeline_mocks.items():
+            mock.side_effect = lambda *a, _name=key.rsplit(".", 1)[-1], **kw: (
+                call_order.append(_name) or DEFAULT
+            )
 
-        mocks = self._run_main(["deck2video", str(md)], patches)
+        run_main([str(marp_md)])
 
         assert "check_ffmpeg" in call_order
         assert "parse_marp" in call_order
@@ -138,32 +67,27 @@ class TestPipelineOrchestration:
         assert call_order.index("render_slides") < call_order.index("generate_audio_for_slides")
         assert call_order.index("generate_audio_for_slides") < call_order.index("assemble_video")
 
-    def test_pronunciations_loaded_and_passed(self, tmp_path):
+    def test_pronunciations_loaded_and_passed(self, tmp_path, run_main):
         md = tmp_path / "deck.md"
         md.write_text("---\nmarp: true\n---\n\n# Slide\n<!-- Hello. -->\n")
         pron = tmp_path / "pron.json"
         pron.write_text(json.dumps({"kubectl": "cube control"}))
 
-        with patch("deck2video.__main__.load_pronunciations", return_value={"kubectl": "cube control"}) as mock_load, \
-             patch("deck2video.__main__.compile_pronunciations", return_value=[]) as mock_compile:
-            patches = _patch_pipeline()
-            patches["deck2video.__main__.load_pronunciations"] = mock_load
-            patches["deck2video.__main__.compile_pronunciations"] = mock_compile
-            mocks = self._run_main(
-                ["deck2video", str(md), "--pronunciations", str(pron)],
-                patches,
-            )
-            mock_load.assert_called_once()
-
-    def test_missing_pronunciations_file_exits(self, tmp_path):
-        md = tmp_path / "deck.md"
-        md.write_text("---\nmarp: true\n---\n\n# Slide\n")
+        mocks = run_main(
+            [str(md), "--pronunciations", str(pron)],
+            {
+                "deck2video.__main__.load_pronunciations": Mock(
+                    return_value={"kubectl": "cube control"}
+                ),
+                "deck2video.__main__.compile_pronunciations": Mock(return_value=[]),
+            },
+        )
+        mocks["deck2video.__main__.load_pronunciations"].assert_called_once()
 
-        with patch("sys.argv", ["deck2video", str(md), "--pronunciations", "/no/such/file.json"]):
-            from deck2video.__main__ import main
-            with patch("deck2video.__main__.check_ffmpeg"):
-                with pytest.raises(SystemExit):
-                    main()
+    def test_missing_pronunciations_file_exits(self, marp_md, monkeypatch):
+        monkeypatch.setattr("deck2video.__main__.check_ffmpeg", lambda: None)
+        with pytest.raises(SystemExit):
+            main([str(marp_md), "--pronunciations", "/no/such/file.json"])
 
 
 # ---------------------------------------------------------------------------
@@ -171,7 +95,7 @@ class TestPipelineOrchestration:
 # ---------------------------------------------------------------------------
 
 class TestVideoPathResolution:
-    def test_video_resolved_relative_to_input(self, tmp_path):
+    def test_video_resolved_relative_to_input(self, tmp_path, pipeline_mocks, run_main, touch_file):
         md = tmp_path / "deck.md"
         md.write_text("---\nmarp: true\n---\n\n# Slide\n<!-- video: assets/demo.mov -->\n")
 
@@ -179,151 +103,54 @@ class TestVideoPathResolution:
         assets = tmp_path / "assets"
         assets.mkdir()
         video_file = assets / "demo.mov"
-        video_file.touch()
+        touch_file(video_file)
 
         slides = [Slide(index=1, body="body", notes=None, video="assets/demo.mov")]
-        patches = _patch_pipeline(**{
-            "deck2video.__main__.parse_marp": MagicMock(return_value=slides),
-            "deck2video.__main__.render_slides": MagicMock(return_value=[Path("/tmp/slides.001")]),
-            "deck2video.__main__.generate_audio_for_slides": MagicMock(return_value=[Path("/tmp/audio_001.wav")]),
-            "deck2video.__main__.get_video_fps": MagicMock(return_value=30.0),
-        })
-
-        import contextlib
-        from deck2video.__main__ import main
-
-        with patch("sys.argv", ["deck2video", str(md)]):
-            with contextlib.ExitStack() as stack:
-                mocks = {}
-                for target, mock_obj in patches.items():
-                    mocks[target] = stack.enter_context(patch(target, mock_obj))
-                main()
-
-                # assemble_video should receive the resolved video path
-                assemble_call = mocks["deck2video.__main__.assemble_video"]
-                call_kwargs = assemble_call.call_args[1]
-                videos = call_kwargs["videos"]
-                assert videos[0] == video_file.resolve()
-
-    def test_missing_video_file_exits(self, tmp_path):
-        md = tmp_path / "deck.md"
-        md.write_text("---\nmarp: true\n---\n\n# Slide\n")
+        pipeline_mocks["deck2video.__main__.parse_marp"].return_value = slides
+        pipeline_mocks["deck2video.__main__.render_slides"].return_value = [Path("/tmp/slides.001")]
+        pipeline_mocks["deck2video.__main__.generate_audio_for_slides"].return_value = [
+            Path("/tmp/audio_001.wav"),
+        ]
 
-        slides = [Slide(index=1, body="body", notes=None, video="missing.mov")]
-        patches = _patch_pipeline(**{
-            "deck2video.__main__.parse_marp": MagicMock(return_value=slides),
-        })
+        run_main([str(md)])
 
-        import contextlib
-        from deck2video.__main__ import main
+        # assemble_video should receive the resolved video path
+        assemble_call = pipeline_mocks["deck2video.__main__.assemble_video"]
+        call_kwargs = assemble_call.call_args[1]
+        videos = call_kwargs["videos"]
+        assert videos[0] == video_file.resolve()
 
-        with patch("sys.argv", ["deck2video", str(md)]):
-            with contextlib.ExitStack() as stack:
-                for target, mock_obj in patches.items():
-                    stack.enter_context(patch(target, mock_obj))
-                with pytest.raises(SystemExit):
-                    main()
+    def test_missing_video_file_exits(self, pipeline_mocks, marp_md, run_main):
+        slides = [Slide(index=1, body="body", notes=None, video="missing.mov")]
+        pipeline_mocks["deck2video.__main__.parse_marp"].return_value = slides
 
-    def test_video_path_traversal_exits(self, tmp_path):
-        """Video paths that escape the input directory should be rejected."""
-        md = tmp_path / "deck.md"
-        md.write_text("---\nmarp: true\n---\n\n# Slide\n")
+        with pytest.raises(SystemExit):
+            run_main([str(marp_md)])
 
+    def test_video_path_traversal_exits(self, pipeline_mocks, marp_md, run_main):
+        """Video paths that escape the input directory should be rejected."""
         slides = [Slide(index=1, body="body", notes=None, video="../../etc/passwd")]
-        patches = _patch_pipeline(**{
-            "deck2video.__main__.parse_marp": MagicMock(return_value=slides),
-        })
-
-        import contextlib
-        from deck2video.__main__ import main
-
-        with patch("sys.argv", ["deck2video", str(md)]):
-            with contextlib.ExitStack() as stack:
-                for target, mock_obj in patches.items():
-                    stack.enter_context(patch(target, mock_obj))
-                with pytest.raises(SystemExit):
-                    main()
+        pipeline_mocks["deck2video.__main__.parse_marp"].return_value = slides
 
-
-# ---------------------------------------------------------------------------
-# FPS auto-detection
-# ---------------------------------------------------------------------------
-
-class TestFpsAutoDetection:
-    def test_explicit_fps_used(self, tmp_path):
-        md = tmp_path / "deck.md"
-        md.write_text("---\nmarp: true\n---\n\n# Slide\n")
-
-        patches = _patch_pipeline()
-
-        import contextlib
-        from deck2video.__main__ import main
-
-        with patch("sys.argv", ["deck2video", str(md), "--fps", "60"]):
-            with contextlib.ExitStack() as stack:
-                mocks = {}
-                for target, mock_obj in patches.items():
-                    mocks[target] = stack.enter_context(patch(target, mock_obj))
-                main()
-
-                assemble_call = mocks["deck2video.__main__.assemble_video"]
-                assert assemble_call.call_args[1]["fps"] == 60
-
-    def test_default_fps_is_24(self, tmp_path):
-        md = tmp_path / "deck.md"
-        md.write_text("---\nmarp: true\n---\n\n# Slide\n")
-
-        patches = _patch_pipeline()
-
-        import contextlib
-        from deck2video.__main__ import main
-
-        with patch("sys.argv", ["deck2video", str(md)]):
-            with contextlib.ExitStack() as stack:
-                mocks = {}
-                for target, mock_obj in patches.items():
-                    mocks[target] = stack.enter_context(patch(target, mock_obj))
-                main()
-
-                assemble_call = mocks["deck2video.__main__.assemble_video"]
-                assert assemble_call.call_args[1]["fps"] == 24
+        with pytest.raises(SystemExit):
+            run_main([str(marp_md)])
 
 
 # ---------------------------------------------------------------------------
-# Audio padding
+# FPS and audio padding passed to the assembler
 # ---------------------------------------------------------------------------
 
-class TestAudioPadding:
-    def _run_main(self, argv, patches):
-        import contextlib
-        from deck2video.__main__ import main
-
-        with patch("sys.argv", argv):
-            with contextlib.ExitStack() as stack:
-                mocks = {}
-                for target, mock_obj in patches.items():
-                    mocks[target] = stack.enter_context(patch(target, mock_obj))
-                main()
-                return mocks
-
-    def test_default_padding_is_zero(self, tmp_path):
-        md = tmp_path / "deck.md"
-        md.write_text("---\nmarp: true\n---\n\n# Slide\n")
-
-        mocks = self._run_main(["deck2video", str(md)], _patch_pipeline())
+class TestAssembleOptions:
+    @pytest.mark.parametrize("extra_argv, key, expected", [
+        ([], "fps", 24),
+        (["--fps", "60"], "fps", 60),
+        ([], "audio_padding_ms", 0),
+        (["--audio-padding", "400"], "audio_padding_ms", 400),
+    ], ids=["default-fps", "explicit-fps", "default-padding", "explicit-padding"])
+    def test_assemble_kwargs(self, extra_argv, key, expected, marp_md, run_main):
+        mocks = run_main([str(marp_md), *extra_argv])
         assemble_call = mocks["deck2video.__main__.assemble_video"]
-        assert assemble_call.call_args[1]["audio_padding_ms"] == 0
-
-    def test_padding_passed_to_assembler(self, tmp_path):
-        md = tmp_path / "deck.md"
-        md.write_text("---\nmarp: true\n---\n\n# Slide\n")
-
-        mocks = self._run_main(
-            ["deck2video", str(md), "--audio-padding", "400"],
-            _patch_pipeline(),
-        )
-        assemble_call = mocks["deck2video.__main__.assemble_video"]
-        assert assemble_call.call_args[1]["audio_padding_ms"] == 400
+        assert assemble_call.call_args[1][key] == expected
 
 
 # ---------------------------------------------------------------------------
@@ -331,21 +158,10 @@ class TestAudioPadding:
 # ---------------------------------------------------------------------------
 
 class TestTempDirectory:
-    def test_user_temp_dir_created(self, tmp_path):
-        md = tmp_path / "deck.md"
-        md.write_text("---\nmarp: true\n---\n\n# Slide\n")
+    def test_user_temp_dir_created(self, tmp_path, marp_md, run_main):
         custom_temp = tmp_path / "my_temp"
 
-        patches = _patch_pipeline()
-
-        import contextlib
-        from deck2video.__main__ import main
-
-        with patch("sys.argv", ["deck2video", str(md), "--temp-dir", str(custom_temp)]):
-            with contextlib.ExitStack() as stack:
-                for target, mock_obj in patches.items():
-                    stack.enter_context(patch(target, mock_obj))
-                main()
+        run_main([str(marp_md), "--temp-dir", str(custom_temp)])
 
         assert custom_temp.exists()
 
@@ -354,75 +170,27 @@ class TestTempDirectory:
 # Format detection and routing
 # ---------------------------------------------------------------------------
 
-class TestFormatRouting:
-    def _run_main(self, argv, patches):
-        import contextlib
-        from deck2video.__main__ import main
-
-        with patch("sys.argv", argv):
-            with contextlib.ExitStack() as stack:
-                mocks = {}
-                for target, mock_obj in patches.items():
-                    mocks[target] = stack.enter_context(patch(target, mock_obj))
-                main()
-                return mocks
-
-    def test_auto_format_calls_detect(self, tmp_path):
-        md = tmp_path / "deck.md"
-        md.write_text("---\nmarp: true\n---\n\n# Slide\n")
-
-        patches = _patch_pipeline()
-        mocks = self._run_main(["deck2video", str(md)], patches)
-        mocks["deck2video.__main__.detect_format"].assert_called_once()
-
-    def test_explicit_marp_skips_detect(self, tmp_path):
-        md = tmp_path / "deck.md"
-        md.write_text("---\nmarp: true\n---\n\n# Slide\n")
-
-        patches = _patch_pipeline()
-        mocks = self._run_main(["deck2video", str(md), "--format", "marp"], patches)
-        mocks["deck2video.__main__.detect_format"].assert_not_called()
-
-    def test_explicit_slidev_skips_detect(self, tmp_path):
-        md = tmp_path / "deck.md"
-        md.write_text("---\ntransition: fade\n---\n\n# Slide\n")
-
-        patches = _patch_pipeline()
-        mocks = self._run_main(["deck2video", str(md), "--format", "slidev"], patches)
-        mocks["deck2video.__main__.detect_format"].assert_not_called()
+MARP_PIPELINE = ["parse_marp", "render_slides"]
+SLIDEV_PIPELINE = ["parse_slidev", "render_slidev_slides"]
 
-    def test_marp_format_uses_marp_pipeline(self, tmp_path):
-        md = tmp_path / "deck.md"
-        md.write_text("---\nmarp: true\n---\n\n# Slide\n")
-
-        patches = _patch_pipeline()
-        mocks = self._run_main(["deck2video", str(md), "--format", "marp"], patches)
-        mocks["deck2video.__main__.parse_marp"].assert_called_once()
-        mocks["deck2video.__main__.render_slides"].assert_called_once()
-        mocks["deck2video.__main__.parse_slidev"].assert_not_called()
-        mocks["deck2video.__main__.render_slidev_slides"].assert_not_called()
-
-    def test_slidev_format_uses_slidev_pipeline(self, tmp_path):
-        md = tmp_path / "deck.md"
-        md.write_text("---\ntransition: fade\n---\n\n# Slide\n")
 
-        patches = _patch_pipeline()
-        mocks = self._run_main(["deck2video", str(md), "--format", "slidev"], patches)
-        mocks["deck2video.__main__.parse_slidev"].assert_called_once()
-        mocks["deck2video.__main__.render_slidev_slides"].assert_called_once()
-        mocks["deck2video.__main__.parse_marp"].assert_not_called()
-        mocks["deck2video.__main__.render_slides"].assert_not_called()
-
-    def test_auto_detected_slidev_uses_slidev_pipeline(self, tmp_path):
-        md = tmp_path / "deck.md"
-        md.write_text("---\ntransition: fade\n---\n\n# Slide\n")
-
-        patches = _patch_pipeline(**{
-            "deck2video.__main__.detect_format": MagicMock(return_value="slidev"),
-        })
-        mocks = self._run_main(["deck2video", str(md)], patches)
-        mocks["deck2video.__main__.parse_slidev"].assert_called_once()
-        mocks["deck2video.__main__.render_slidev_slides"].assert_called_once()
+class TestFormatRouting:
+    @pytest.mark.parametrize("extra_argv, detected, expect_called, expect_not_called", [
+        ([], "marp", ["detect_format", *MARP_PIPELINE], SLIDEV_PIPELINE),
+        ([], "slidev", ["detect_format", *SLIDEV_PIPELINE], MARP_PIPELINE),
+        (["--format", "marp"], "marp", MARP_PIPELINE, ["detect_format", *SLIDEV_PIPELINE]),
+        (["--format", "slidev"], "marp", SLIDEV_PIPELINE, ["detect_format", *MARP_PIPELINE]),
+    ], ids=["auto-marp", "auto-slidev", "explicit-marp", "explicit-slidev"])
+    def test_format_selects_pipeline(
+        self, extra_argv, detected, expect_called, expect_not_called,
+        pipeline_mocks, marp_md, run_main,
+    ):
+        pipeline_mocks["deck2video.__main__.detect_format"].return_value = detected
+        run_main([str(marp_md), *extra_argv])
+        for name in expect_called:
+            pipeline_mocks[f"deck2video.__main__.{name}"].assert_called_once()
+        for name in expect_not_called:
+            pipeline_mocks[f"deck2video.__main__.{name}"].assert_not_called()
 
 
 # ---------------------------------------------------------------------------
@@ -430,61 +198,26 @@ class TestFormatRouting:
 # ---------------------------------------------------------------------------
 
 class TestPipelineFailure:
-    def test_pipeline_failure_preserves_temp_and_reraises(self, tmp_path):
-        md = tmp_path / "deck.md"
-        md.write_text("---\nmarp: true\n---\n\n# Slide\n")
-
-        patches = _patch_pipeline(**{
-            "deck2video.__main__.assemble_video": MagicMock(
-                side_effect=RuntimeError("ffmpeg exploded")
-            ),
-        })
-
-        import contextlib
-        from deck2video.__main__ import main
-
-        with patch("sys.argv", ["deck2video", str(md)]):
-            with contextlib.ExitStack() as stack:
-                for target, mock_obj in patches.items():
-                    stack.enter_context(patch(target, mock_obj))
-                with pytest.raises(RuntimeError, match="ffmpeg exploded"):
-                    main()
-
-    def test_keep_temp_preserves_files(self, tmp_path):
-        md = tmp_path / "deck.md"
-        md.write_text("---\nmarp: true\n---\n\n# Slide\n")
-
-        patches = _patch_pipeline()
+    def test_pipeline_failure_preserves_temp_and_reraises(self, pipeline_mocks, marp_md, run_main):
+        pipeline_mocks["deck2video.__main__.assemble_video"].side_effect = RuntimeError(
+            "ffmpeg exploded"
+        )
 
-        import contextlib
-        from deck2video.__main__ import main
+        with pytest.raises(RuntimeError, match="ffmpeg exploded"):
+            run_main([str(marp_md)])
 
-        with patch("sys.argv", ["deck2video", str(md), "--keep-temp",
-                                 "--temp-dir", str(tmp_path / "build")]):
-            with contextlib.ExitStack() as stack:
-                for target, mock_obj in patches.items():
-                    stack.enter_context(patch(target, mock_obj))
-                main()
+    def test_keep_temp_preserves_files(self, tmp_path, marp_md, run_main):
+        run_main([str(marp_md), "--keep-temp",
+                  "--temp-dir", str(tmp_path / "build")])
 
         # Temp dir should still exist
         assert (tmp_path / "build").exists()
 
-    def test_keep_temp_prints_message(self, tmp_path, capsys):
-        md = tmp_path / "deck.md"
-        md.write_text("---\nmarp: true\n---\n\n# Slide\n")
+    def test_keep_temp_prints_message(self, tmp_path, capsys, marp_md, run_main):
         build_dir = tmp_path / "kept"
 
-        patches = _patch_pipeline()
-
-        import contextlib
-        from deck2video.__main__ import main
-
-        with patch("sys.argv", ["deck2video", str(md), "--keep-temp",
-                                 "--temp-dir", str(build_dir)]):
-            with contextlib.ExitStack() as stack:
-                for target, mock_obj in patches.items():
-                    stack.enter_context(patch(target, mock_obj))
-                main()
+        run_main([str(marp_md), "--keep-temp",
+                  "--temp-dir", str(build_dir)])
 
         captured = capsys.readouterr()
         assert "Temp files kept at:" in captured.out
@@ -495,51 +228,28 @@ class TestPipelineFailure:
 # ---------------------------------------------------------------------------
 
 class TestDiscoverTempFiles:
-    def test_finds_slidev_images_and_audio(self, tmp_path):
-        for i in range(1, 4):
-            (tmp_path / f"slides.{i:03d}.png").touch()
-            (tmp_path / f"audio_{i:03d}.wav").touch()
-
-        images, audio = _discover_temp_files(tmp_path)
+    def test_finds_slidev_images_and_audio(self, make_temp_files):
+        images, audio = _discover_temp_files(make_temp_files(3, 3))
         assert len(images) == 3
         assert len(audio) == 3
         assert all(p.suffix == ".png" for p in images)
 
-    def test_finds_marp_images_and_audio(self, tmp_path):
-        for i in range(1, 3):
-            (tmp_path / f"slides.{i:03d}").touch()
-            (tmp_path / f"audio_{i:03d}.wav").touch()
-
-        images, audio = _discover_temp_files(tmp_path)
+    def test_finds_marp_images_and_audio(self, make_temp_files):
+        images, audio = _discover_temp_files(make_temp_files(2, 2, png_suffix=""))
         assert len(images) == 2
         assert len(audio) == 2
 
-    def test_prefers_slidev_over_marp(self, tmp_path):
+    def test_prefers_slidev_over_marp(self, make_temp_files):
         """If both .png and extensionless exist, picks .png (Slidev)."""
-        for i in range(1, 3):
-            (tmp_path / f"slides.{i:03d}.png").touch()
-            (tmp_path / f"slides.{i:03d}").touch()
-            (tmp_path / f"audio_{i:03d}.wav").touch()
-
-        images, _ = _discover_temp_files(tmp_path)
+        make_temp_files(2, 0, png_suffix="")
+        images, _ = _discover_temp_files(make_temp_files(2, 2))
         assert all(p.suffix == ".png" for p in images)
 
-    def test_no_images_exits(self, tmp_path):
-        (tmp_path / "audio_001.wav").touch()
+    @pytest.mark.parametrize("n_png, n_wav", [(0, 1), (1, 0), (2, 1)],
+                             ids=["no-images", "no-audio", "count-mismatch"])
+    def test_missing_or_mismatched_files_exit(self, make_temp_files, n_png, n_wav):
         with pytest.raises(SystemExit):
-            _discover_temp_files(tmp_path)
-
-    def test_no_audio_exits(self, tmp_path):
-        (tmp_path / "slides.001.png").touch()
-        with pytest.raises(SystemExit):
-            _discover_temp_files(tmp_path)
-
-    def test_count_mismatch_exits(self, tmp_path):
-        (tmp_path / "slides.001.png").touch()
-        (tmp_path / "slides.002.png").touch()
-        (tmp_path / "audio_001.wav").touch()
-        with pytest.raises(SystemExit):
-            _discover_temp_files(tmp_path)
+            _discover_temp_files(make_temp_files(n_png, n_wav))
 
 
 # ---------------------------------------------------------------------------
@@ -570,123 +280,72 @@ class TestParseSlideList:
 # ---------------------------------------------------------------------------
 
 class TestReassembleMode:
-    def _run_main(self, argv, patches):
-        import contextlib
-        from deck2video.__main__ import main
-
-        with patch("sys.argv", argv):
-            with contextlib.ExitStack() as stack:
-                mocks = {}
-                for target, mock_obj in patches.items():
-                    mocks[target] = stack.enter_context(patch(target, mock_obj))
-                main()
-                return mocks
-
-    def test_reassemble_requires_temp_dir(self, tmp_path):
-        md = tmp_path / "deck.md"
-        md.write_text("---\nmarp: true\n---\n\n# Slide\n")
-
-        from deck2video.__main__ import main
-        with patch("sys.argv", ["deck2video", str(md), "--reassemble"]):
-            with patch("deck2video.__main__.check_ffmpeg"):
-                with pytest.raises(SystemExit):
-                    main()
+    def test_reassemble_requires_temp_dir(self, marp_md, monkeypatch):
+        monkeypatch.setattr("deck2video.__main__.check_ffmpeg", lambda: None)
+        with pytest.raises(SystemExit):
+            main([str(marp_md), "--reassemble"])
 
-    def test_reassemble_skips_render_tts(self, tmp_path):
-        md = tmp_path / "deck.md"
-        md.write_text("---\nmarp: true\n---\n\n# Slide\n")
-        temp = tmp_path / "build"
-        temp.mkdir()
-        for i in range(1, 3):
-            (temp / f"slides.{i:03d}.png").touch()
-            (temp / f"audio_{i:03d}.wav").touch()
-
-        patches = _patch_pipeline()
-        mocks = self._run_main(
-            ["deck2video", str(md), "--reassemble", "--temp-dir", str(temp)],
-            patches,
-        )
+    def test_reassemble_skips_render_tts(
+        self, pipeline_mocks, marp_md, populated_build_dir, run_main,
+    ):
+        run_main([str(marp_md), "--reassemble", "--temp-dir", str(populated_build_dir)])
 
         # Parse IS called (to resolve video paths and detect FPS)
-        mocks["deck2video.__main__.parse_marp"].assert_called_once()
+        pipeline_mocks["deck2video.__main__.parse_marp"].assert_called_once()
 
         # Render and TTS should NOT be called
-        mocks["deck2video.__main__.render_slides"].assert_not_called()
-        mocks["deck2video.__main__.render_slidev_slides"].assert_not_called()
-        mocks["deck2video.__main__.generate_audio_for_slides"].assert_not_called()
+        pipeline_mocks["deck2video.__main__.render_slides"].assert_not_called()
+        pipeline_mocks["deck2video.__main__.render_slidev_slides"].assert_not_called()
+        pipeline_mocks["deck2video.__main__.generate_audio_for_slides"].assert_not_called()
 
         # Assemble SHOULD be called
-        mocks["deck2video.__main__.assemble_video"].assert_called_once()
+        pipeline_mocks["deck2video.__main__.assemble_video"].assert_called_once()
 
-    def test_reassemble_passes_discovered_files(self, tmp_path):
+    def test_reassemble_passes_discovered_files(
+        self, tmp_path, pipeline_mocks, populated_build_dir, run_main,
+    ):
         md = tmp_path / "deck.md"
         md.write_text("---\nmarp: true\n---\n\n# Slide 1\n\n---\n\n# Slide 2\n")
-        temp = tmp_path / "build"
-        temp.mkdir()
-        for i in range(1, 3):
-            (temp / f"slides.{i:03d}.png").touch()
-            (temp / f"audio_{i:03d}.wav").touch()
-
-        patches = _patch_pipeline()
-        mocks = self._run_main(
-            ["deck2video", str(md), "--reassemble", "--temp-dir", str(temp)],
-            patches,
-        )
 
-        call_args = mocks["deck2video.__main__.assemble_video"].call_args
+        run_main([str(md), "--reassemble", "--temp-dir", str(populated_build_dir)])
+
+        call_args = pipeline_mocks["deck2video.__main__.assemble_video"].call_args
         images_arg = call_args[0][0]
         audio_arg = call_args[0][1]
         assert len(images_arg) == 2
         assert len(audio_arg) == 2
 
-    def test_reassemble_passes_videos_and_detects_fps(self, tmp_path):
+    def test_reassemble_passes_videos_and_detects_fps(
+        self, tmp_path, pipeline_mocks, populated_build_dir, run_main, touch_file,
+    ):
         md = tmp_path / "deck.md"
         md.write_text("---\nmarp: true\n---\n\n# Slide\n")
-        temp = tmp_path / "build"
-        temp.mkdir()
-        for i in range(1, 3):
-            (temp / f"slides.{i:03d}.png").touch()
-            (temp / f"audio_{i:03d}.wav").touch()
 
         # Create a video file
         assets = tmp_path / "assets"
         assets.mkdir()
         video_file = assets / "demo.mov"
-        video_file.touch()
+        touch_file(video_file)
 
         slides = [
             Slide(index=1, body="body", notes="Hello", video="assets/demo.mov"),
             Slide(index=2, body="body", notes=None, video=None),
         ]
-        patches = _patch_pipeline(**{
-            "deck2video.__main__.parse_marp": MagicMock(return_value=slides),
-            "deck2video.__main__.get_video_fps": MagicMock(return_value=60.0),
-        })
-
-        mocks = self._run_main(
-            ["deck2video", str(md), "--reassemble", "--temp-dir", str(temp)],
-            patches,
-        )
+        pipeline_mocks["deck2video.__main__.parse_marp"].return_value = slides
+        pipeline_mocks["deck2video.__main__.get_video_fps"].return_value = 60.0
 
-        assemble_call = mocks["deck2video.__main__.assemble_video"]
+        run_main([str(md), "--reassemble", "--temp-dir", str(populated_build_dir)])
+
+        assemble_call = pipeline_mocks["deck2video.__main__.assemble_video"]
         call_kwargs = assemble_call.call_args[1]
         assert call_kwargs["videos"][0] == video_file.resolve()
         assert call_kwargs["videos"][1] is None
         assert call_kwargs["fps"] == 60
 
-    def test_reassemble_requires_input_file(self, tmp_path):
-        temp = tmp_path / "build"
-        temp.mkdir()
-        for i in range(1, 3):
-            (temp / f"slides.{i:03d}.png").touch()
-            (temp / f"audio_{i:03d}.wav").touch()
-
-        from deck2video.__main__ import main
-        with patch("sys.argv", ["deck2video", str(tmp_path / "missing.md"),
-                                 "--reassemble", "--temp-dir", str(temp)]):
-            with patch("deck2video.__main__.check_ffmpeg"):
-                with pytest.raises(SystemExit):
-                    main()
+    def test_reassemble_requires_input_file(self, tmp_path, populated_build_dir, monkeypatch):
+        monkeypatch.setattr("deck2video.__main__.check_ffmpeg", lambda: None)
+        with pytest.raises(SystemExit):
+            main([str(tmp_path / "missing.md"), "--reassemble", "--temp-dir", str(populated_build_dir)])
 
 
 # ---------------------------------------------------------------------------
@@ -694,145 +353,87 @@ class TestReassembleMode:
 # ---------------------------------------------------------------------------
 
 class TestRedoSlidesMode:
-    def _run_main(self, argv, patches):
-        import contextlib
-        from deck2video.__main__ import main
-
-        with patch("sys.argv", argv):
-            with contextlib.ExitStack() as stack:
-                mocks = {}
-                for target, mock_obj in patches.items():
-                    mocks[target] = stack.enter_context(patch(target, mock_obj))
-                main()
-                return mocks
-
-    def test_redo_slides_requires_temp_dir(self, tmp_path):
-        md = tmp_path / "deck.md"
-        md.write_text("---\nmarp: true\n---\n\n# Slide\n")
+    def test_redo_slides_requires_temp_dir(self, marp_md, monkeypatch):
+        monkeypatch.setattr("deck2video.__main__.check_ffmpeg", lambda: None)
+        with pytest.raises(SystemExit):
+            main([str(marp_md), "--redo-slides", "1"])
+
+    def test_redo_slides_requires_input_file(self, tmp_path, populated_build_dir, monkeypatch):
+        monkeypatch.setattr("deck2video.__main__.check_ffmpeg", lambda: None)
+        with pytest.raises(SystemExit):
+            main([str(tmp_path / "missing.md"), "--redo-slides", "1",
+                  "--temp-dir", str(populated_build_dir)])
 
-        from deck2video.__main__ import main
-        with patch("sys.argv", ["deck2video", str(md), "--redo-slides", "1"]):
-            with patch("deck2video.__main__.check_ffmpeg"):
-                with pytest.raises(SystemExit):
-                    main()
-
-    def test_redo_slides_requires_input_file(self, tmp_path):
-        temp = tmp_path / "build"
-        temp.mkdir()
-        for i in range(1, 3):
-            (temp / f"slides.{i:03d}.png").touch()
-            (temp / f"audio_{i:03d}.wav").touch()
-
-        from deck2video.__main__ import main
-        with patch("sys.argv", ["deck2video", str(tmp_path / "missing.md"),
-                                 "--redo-slides", "1", "--temp-dir", str(temp)]):
-            with patch("deck2video.__main__.check_ffmpeg"):
-                with pytest.raises(SystemExit):
-                    main()
-
-    def test_redo_slides_regenerates_selected_and_assembles(self, tmp_path):
+    def test_redo_slides_regenerates_selected_and_assembles(
+        self, tmp_path, pipeline_mocks, populated_build_dir, run_main,
+    ):
         md = tmp_path / "deck.md"
         md.write_text("---\nmarp: true\n---\n\n# Slide 1\n<!-- Hello -->\n\n---\n\n# Slide 2\n<!-- World -->\n")
-        temp = tmp_path / "build"
-        temp.mkdir()
-        for i in range(1, 3):
-            (temp / f"slides.{i:03d}.png").touch()
-            (temp / f"audio_{i:03d}.wav").touch()
 
         slides = [
             Slide(index=1, body="# Slide 1", notes="Hello", video=None),
             Slide(index=2, body="# Slide 2", notes="World", video=None),
         ]
-        patches = _patch_pipeline(**{
-            "deck2video.__main__.parse_marp": MagicMock(return_value=slides),
-        })
-
-        mocks = self._run_main(
-            ["deck2video", str(md), "--redo-slides", "2",
-             "--temp-dir", str(temp), "--voice", "voice.wav"],
-            patches,
-        )
+        pipeline_mocks["deck2video.__main__.parse_marp"].return_value = slides
+
+        run_main([str(md), "--redo-slides", "2",
+                  "--temp-dir", str(populated_build_dir), "--voice", "voice.wav"])
 
         # TTS should be called with only slide 2
-        gen_call = mocks["deck2video.__main__.generate_audio_for_slides"]
+        gen_call = pipeline_mocks["deck2video.__main__.generate_audio_for_slides"]
         gen_call.assert_called_once()
         slides_arg = gen_call.call_args[0][0]
         assert len(slides_arg) == 1
         assert slides_arg[0].index == 2
 
         # Render should NOT be called
-        mocks["deck2video.__main__.render_slides"].assert_not_called()
+        pipeline_mocks["deck2video.__main__.render_slides"].assert_not_called()
 
         # Assemble should be called
-        mocks["deck2video.__main__.assemble_video"].assert_called_once()
+        pipeline_mocks["deck2video.__main__.assemble_video"].assert_called_once()
 
-    def test_redo_slides_passes_videos_and_detects_fps(self, tmp_path):
+    def test_redo_slides_passes_videos_and_detects_fps(
+        self, tmp_path, pipeline_mocks, populated_build_dir, run_main, touch_file,
+    ):
         md = tmp_path / "deck.md"
         md.write_text("---\nmarp: true\n---\n\n# Slide 1\n<!-- Hello -->\n\n---\n\n# Slide 2\n<!-- World -->\n")
-        temp = tmp_path / "build"
-        temp.mkdir()
-        for i in range(1, 3):
-            (temp / f"slides.{i:03d}.png").touch()
-            (temp / f"audio_{i:03d}.wav").touch()
 
         # Create a video file
         assets = tmp_path / "assets"
         assets.mkdir()
         video_file = assets / "demo.mov"
-        video_file.touch()
+        touch_file(video_file)
 
         slides = [
             Slide(index=1, body="# Slide 1", notes="Hello", video="assets/demo.mov"),
             Slide(index=2, body="# Slide 2", notes="World", video=None),
         ]
-        patches = _patch_pipeline(**{
-            "deck2video.__main__.parse_marp": MagicMock(return_value=slides),
-            "deck2video.__main__.get_video_fps": MagicMock(return_value=30.0),
-        })
-
-        mocks = self._run_main(
-            ["deck2video", str(md), "--redo-slides", "2",
-             "--temp-dir", str(temp), "--voice", "voice.wav"],
-            patches,
-        )
+        pipeline_mocks["deck2video.__main__.parse_marp"].return_value = slides
+        pipeline_mocks["deck2video.__main__.get_video_fps"].return_value = 45.0
 
-        assemble_call = mocks["deck2video.__main__.assemble_video"]
+        run_main([str(md), "--redo-slides", "2",
+                  "--temp-dir", str(populated_build_dir), "--voice", "voice.wav"])
+
+        assemble_call = pipeline_mocks["deck2video.__main__.assemble_video"]
         call_kwargs = assemble_call.call_args[1]
         assert call_kwargs["videos"][0] == video_file.resolve()
         assert call_kwargs["videos"][1] is None
-        assert call_kwargs["fps"] == 30
+        assert call_kwargs["fps"] == 45
 
-    def test_redo_slides_invalid_index_exits(self, tmp_path):
+    def test_redo_slides_invalid_index_exits(
+        self, tmp_path, pipeline_mocks, populated_build_dir, run_main,
+    ):
         md = tmp_path / "deck.md"
         md.write_text("---\nmarp: true\n---\n\n# Slide 1\n")
-        temp = tmp_path / "build"
-        temp.mkdir()
-        (temp / "slides.001.png").touch()
-        (temp / "audio_001.wav").touch()
 
         slides = [Slide(index=1, body="# Slide 1", notes="Hello", video=None)]
-        patches = _patch_pipeline(**{
-            "deck2video.__main__.parse_marp": MagicMock(return_value=slides),
-        })
-
-        import contextlib
-        from deck2video.__main__ import main
-
-        with patch("sys.argv", ["deck2video", str(md), "--redo-slides", "5",
-                                 "--temp-dir", str(temp)]):
-            with contextlib.ExitStack() as stack:
-                for target, mock_obj in patches.items():
-                    stack.enter_context(patch(target, mock_obj))
-                with pytest.raises(SystemExit):
-                    main()
-
-    def test_reassemble_and_redo_slides_mutually_exclusive(self, tmp_path):
-        """argparse should reject both flags together."""
-        md = tmp_path / "deck.md"
-        md.write_text("---\nmarp: true\n---\n\n# Slide\n")
+        pipeline_mocks["deck2video.__main__.parse_marp"].return_value = slides
 
-        from deck2video.__main__ import main
-        with patch("sys.argv", ["deck2video", str(md), "--reassemble",
-                                 "--redo-slides", "1", "--temp-dir", str(tmp_path)]):
-            with pytest.raises(SystemExit):
-                main()
+        with pytest.raises(SystemExit):
+            run_main([str(md), "--redo-slides", "5",
+                      "--temp-dir", str(populated_build_dir)])
+
+    def test_reassemble_and_redo_slides_mutually_exclusive(self, tmp_path, marp_md):
+        """argparse should reject both flags together."""
+        with pytest.raises(SystemExit):
+            main([str(marp_md), "--reassemble", "--redo-slides", "1", "--temp-dir", str(tmp_path)])